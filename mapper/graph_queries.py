@@ -5,7 +5,8 @@ Provides convenient methods to search and analyze the discovered UI structure.
 import json
 import os
 import re
-from typing import List, Dict, Optional, Any
+from collections import OrderedDict
+from typing import List, Dict, Optional, Any, Tuple
 from pathlib import Path
 
 try:
@@ -14,6 +15,9 @@ try:
 except ImportError:
     CHROMADB_AVAILABLE = False
 
+# Recent semantic_search results kept per GraphQueries instance
+SEARCH_CACHE_SIZE = 128
+
 
 class GraphQueries:
     """Helper class for querying semantic graph and ChromaDB."""
@@ -78,6 +82,13 @@ class GraphQueries:
         if persona:
             print(f"   Persona: {persona}")
         
+        # (query, n_results, persona, collection count) -> formatted results, LRU order
+        self._search_cache: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+        # The graph is not modified after loading, so lookups built from it are
+        # computed on first use and kept for the lifetime of this instance
+        self._node_index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._persona_nodes: Dict[str, List[Dict[str, Any]]] = {}
+        
         # Connect to ChromaDB (optional)
         if CHROMADB_AVAILABLE and self.chromadb_path.exists():
             try:
@@ -181,11 +192,12 @@ class GraphQueries:
                     results.append({**component, "_node": node})
         return results
     
-    def find_components_using_api(self, api_endpoint: str) -> List[Dict[str, Any]]:
+    def find_components_using_api(self, api_endpoint: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Find components that trigger a specific API.
         
         Args:
             api_endpoint: API like "POST /items" or "GET /products/{productId}"
+            limit: Stop after this many matches (graph order); None returns all
         
         Returns:
             List of components that trigger this API
@@ -213,6 +225,8 @@ class GraphQueries:
                 if any(api_endpoint in api or normalized_api in api or api in api_endpoint or api in normalized_api 
                        for api in triggers):
                     results.append({**component, "_node": node})
+                    if limit is not None and len(results) >= limit:
+                        return results
         return results
     
     def find_components_impacting_table(self, table_name: str) -> List[Dict[str, Any]]:
@@ -281,10 +295,31 @@ class GraphQueries:
         Returns:
             Node dict or None
         """
-        for node in self.graph["nodes"]:
-            if node.get("semantic_name") == name or node.get("id") == name:
-                return node
-        return None
+        return self._get_node_index().get(name)
+    
+    def find_nodes_by_semantic_names(self, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Find several nodes by semantic name or id in one pass over the graph.
+        
+        Args:
+            names: Semantic names/ids to look up
+        
+        Returns:
+            Dict mapping each found name to its node (same match as
+            find_node_by_semantic_name; missing names are omitted)
+        """
+        index = self._get_node_index()
+        return {name: index[name] for name in names if name in index}
+    
+    def _get_node_index(self) -> Dict[str, Dict[str, Any]]:
+        """Map every semantic name and id to the first node (graph order) carrying it."""
+        if self._node_index is None:
+            index = {}
+            for node in self.graph["nodes"]:
+                for key in (node.get("semantic_name"), node.get("id")):
+                    if key is not None:
+                        index.setdefault(key, node)
+            self._node_index = index
+        return self._node_index
     
     def get_all_nodes(self, persona: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all nodes in the graph.
@@ -297,8 +332,12 @@ class GraphQueries:
         """
         nodes = self.graph.get("nodes", [])
         if persona:
-            return [node for node in nodes 
-                   if node.get("context", {}).get("persona", "").lower() == persona.lower()]
+            persona_lower = persona.lower()
+            if persona_lower not in self._persona_nodes:
+                self._persona_nodes[persona_lower] = [
+                    node for node in nodes
+                    if node.get("context", {}).get("persona", "").lower() == persona_lower]
+            return list(self._persona_nodes[persona_lower])
         return nodes
     
     # --- API Queries ---
@@ -401,6 +440,7 @@ class GraphQueries:
             self.collection = self.chroma_client.create_collection(name="ui_semantic_map")
         
         print(f"📝 Indexing semantic graph into ChromaDB...")
+        self._search_cache.clear()
         
         documents = []
         metadatas = []
@@ -541,6 +581,9 @@ class GraphQueries:
         
         Returns:
             List of matching entries with metadata
+        
+        Results are cached per (query, n_results, persona) while the collection
+        size is unchanged, so repeated searches skip embedding and ANN lookup.
         """
         if not self.collection:
             raise RuntimeError(
@@ -553,6 +596,7 @@ class GraphQueries:
         
         try:
             # Check if collection has any data
+            count = None
             try:
                 count = self.collection.count()
                 if count == 0:
@@ -563,6 +607,12 @@ class GraphQueries:
             except Exception:
                 pass  # count() might fail, continue anyway
             
+            cache_key = (query, n_results, filter_persona, count)
+            cached = self._search_cache.get(cache_key)
+            if cached is not None and count is not None:
+                self._search_cache.move_to_end(cache_key)
+                return list(cached)
+            
             # Build where clause for persona filtering
             where_clause = None
             if filter_persona:
@@ -596,7 +646,12 @@ class GraphQueries:
                            if r["metadata"].get("persona", "").lower() == filter_persona.lower()]
             
             # Return top n_results
-            return formatted[:n_results]
+            formatted = formatted[:n_results]
+            if count is not None:
+                self._search_cache[cache_key] = formatted
+                if len(self._search_cache) > SEARCH_CACHE_SIZE:
+                    self._search_cache.popitem(last=False)
+            return list(formatted)
         except Exception as e:
             raise RuntimeError(f"ChromaDB search failed: {e}")
     
@@ -0,0 +1,37 @@
+"""Tests for the exact-prompt LLM response cache."""
+import context_processor as cp
+
+
+def test_round_trip_is_exact_only(tmp_path):
+    cache = cp.LLMResponseCache("llama3.1:8b", path=tmp_path)
+    cache.put("prompt A", '{"x": 1}')
+
+    assert cache.lookup("prompt A") == '{"x": 1}'
+    assert cache.lookup("prompt A ") is None
+    assert cache.path.parent == tmp_path
+    assert ":" not in cache.path.name
+
+
+def test_namespaces_are_separate(tmp_path):
+    cp.LLMResponseCache("model-a", path=tmp_path).put("p", "a")
+
+    assert cp.LLMResponseCache("model-b", path=tmp_path).lookup("p") is None
+    assert cp.LLMResponseCache("model-a", path=tmp_path).lookup("p") == "a"
+
+
+def test_corrupt_entry_reads_as_miss(tmp_path):
+    cache = cp.LLMResponseCache("m", path=tmp_path)
+    cache.put("p", "a")
+    cache._entry("p").write_text("{not json")
+
+    assert cache.lookup("p") is None
+
+
+def test_from_env_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv("LLM_RESPONSE_CACHE", raising=False)
+    assert cp.LLMResponseCache.from_env("m") is None
+
+    monkeypatch.setenv("LLM_RESPONSE_CACHE", "1")
+    monkeypatch.setenv("LLM_RESPONSE_CACHE_DIR", str(tmp_path))
+    cache = cp.LLMResponseCache.from_env("m")
+    assert cache is not None and cache.path == tmp_path / "m"
@@ -0,0 +1,53 @@
+"""Tests for the shared per-PR context and the on-disk PR cache."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import context_processor as cp
+
+
+def _processor():
+    return cp.ContextProcessor(graph_queries=None, llm=None, use_agentic_context=False)
+
+
+def test_concurrent_callers_share_one_fetch(monkeypatch):
+    processor = _processor()
+    calls = []
+
+    def fake_fetch(owner, repo, pr_number, github_domain="github.com"):
+        calls.append((owner, repo, pr_number))
+        time.sleep(0.05)  # Keep the fetch in flight while the others arrive
+        return {"files": [], "head": {"sha": "abc"}}
+
+    monkeypatch.setattr(processor, "_fetch_pr_diff", fake_fetch)
+    links = ["https://github.com/o/r/pull/7", "https://github.com/o/r/pull/7.",
+             "<https://github.com/o/r/pull/7>", "https://github.com/o/r/pull/7"]
+    with ThreadPoolExecutor(max_workers=len(links)) as executor:
+        contexts = list(executor.map(processor._get_or_build_pr_context, links))
+
+    assert calls == [("o", "r", "7")]
+    assert all(ctx is contexts[0] for ctx in contexts)
+
+
+def test_failed_fetch_is_retried_on_next_call(monkeypatch):
+    processor = _processor()
+    results = [None, {"files": []}]
+    monkeypatch.setattr(processor, "_fetch_pr_diff", lambda *a, **k: results.pop(0))
+
+    assert processor._get_or_build_pr_context("https://github.com/o/r/pull/7")["pr_data"] is None
+    assert processor._get_or_build_pr_context("https://github.com/o/r/pull/7")["pr_data"] == {"files": []}
+
+
+def test_pr_cache_write_is_atomic_and_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "pr_cache" / "github.com_o_r_7.json"
+    barrier = threading.Barrier(4)
+
+    def write(i):
+        barrier.wait()
+        cp._write_pr_cache(path, {"writer": i, "data": list(range(1000))})
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(write, range(4)))
+
+    assert cp._read_pr_cache(path)["writer"] in range(4)
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
@@ -0,0 +1,34 @@
+"""Tests for PR link parsing in context_processor."""
+import pytest
+
+from context_processor import _parse_pr_link
+
+
+@pytest.mark.parametrize("link", [
+    "https://github.com/o/r/pull/12",
+    "https://github.com/o/r/pull/12/files",
+    "https://github.com/o/r/pull/12.",
+    "https://github.com/o/r/pull/12,",
+    "https://github.com/o/r/pull/12)",
+    "https://github.com/o/r/pull/12).",
+    "<https://github.com/o/r/pull/12>",
+    "https://github.com/o/r/pull/12#discussion_r1",
+    "  github.com/o/r/pull/12  ",
+])
+def test_parses_github_links_with_surrounding_punctuation(link):
+    assert _parse_pr_link(link) == ("github.com", "o", "r", "12")
+
+
+def test_parses_enterprise_links():
+    assert _parse_pr_link("https://git.corp.example/team/svc/pull/7") == ("git.corp.example", "team", "svc", "7")
+
+
+@pytest.mark.parametrize("link", [
+    "",
+    "https://github.com/o/r",
+    "https://github.com/o/r/issues/12",
+    "https://github.com/o/r/pull/abc",
+    "https://github.com//r/pull/12",
+])
+def test_rejects_non_pr_links(link):
+    assert _parse_pr_link(link) is None
@@ -0,0 +1,50 @@
+"""Tests for the opt-in rule-based intent shortcut."""
+import pytest
+
+import context_processor as cp
+
+
+class _FailingLLM:
+    def invoke(self, prompt):
+        raise AssertionError("the LLM should not be called")
+
+
+def _processor(rule_based_intent=True):
+    return cp.ContextProcessor(graph_queries=None, llm=_FailingLLM(), use_agentic_context=False,
+                               rule_based_intent=rule_based_intent)
+
+
+SEMANTIC = {"entities": ["Product", "Order"]}
+PR_SUMMARY = {"db_changes": {"tables": ["products"]}}
+
+
+def test_accepts_single_entity_with_change_clause_and_matching_table():
+    intent = _processor()._cheap_intent(
+        "Add a category column to the products list for resellers.", SEMANTIC, PR_SUMMARY)
+
+    assert intent["primary_entity"] == "Product"
+    assert intent["changes"] == ["Add a category column to the products list for resellers"]
+    assert intent["personas"] == ["Reseller"]
+
+
+@pytest.mark.parametrize("description, semantic_context, pr_summary", [
+    # No add/remove/modify/update clause
+    ("Show the category on the products page.", SEMANTIC, PR_SUMMARY),
+    # Two graph entities named
+    ("Add the product name to each order.", SEMANTIC, PR_SUMMARY),
+    # The PR touches a different table
+    ("Add a category column to products.", SEMANTIC, {"db_changes": {"tables": ["orders"]}}),
+    # No PR DB changes or no graph entities to match against
+    ("Add a category column to products.", SEMANTIC, None),
+    ("Add a category column to products.", None, PR_SUMMARY),
+])
+def test_defers_to_llm_when_ambiguous(description, semantic_context, pr_summary):
+    assert _processor()._cheap_intent(description, semantic_context, pr_summary) is None
+
+
+def test_extract_intent_uses_rules_only_when_enabled():
+    description = "Add a category column to products."
+
+    assert _processor().extract_intent(description, SEMANTIC, PR_SUMMARY)["primary_entity"] == "Product"
+    with pytest.raises(AssertionError, match="should not be called"):
+        _processor(rule_based_intent=False).extract_intent(description, SEMANTIC, PR_SUMMARY)
@@ -0,0 +1,165 @@
+"""Tests for the per-task step cache and the parsing helpers behind it."""
+import pytest
+
+import context_processor as cp
+
+
+class _Counter:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+def _processor(monkeypatch, pr_data):
+    processor = cp.ContextProcessor(graph_queries=None, llm=None, use_agentic_context=False)
+    monkeypatch.setattr(processor, "_fetch_pr_diff", lambda *a, **k: pr_data)
+    return processor
+
+
+TASK = {"description": "Add a category column to products.", "pr_link": "https://github.com/o/r/pull/7"}
+
+
+def test_load_or_compute_reuses_stored_result(tmp_path):
+    compute = _Counter({"primary_entity": "Product"})
+
+    first = cp._load_or_compute(tmp_path, "intent", "k", compute)
+    second = cp._load_or_compute(tmp_path, "intent", "k", compute)
+
+    assert first == second == {"primary_entity": "Product"}
+    assert compute.calls == 1
+    assert (tmp_path / "intent_k.json").exists()
+
+
+def test_load_or_compute_without_cache_dir_always_computes():
+    # --no-cache passes cache_dir=None
+    compute = _Counter({"primary_entity": "Product"})
+
+    cp._load_or_compute(None, "intent", "k", compute)
+    cp._load_or_compute(None, "intent", "k", compute)
+
+    assert compute.calls == 2
+
+
+@pytest.mark.parametrize("result", [{}, {"primary_entity": "Unknown"}])
+def test_load_or_compute_skips_results_rejected_by_predicate(tmp_path, result):
+    compute = _Counter(result)
+
+    cp._load_or_compute(tmp_path, "intent", "k", compute, cacheable=cp._is_real_intent)
+    cp._load_or_compute(tmp_path, "intent", "k", compute, cacheable=cp._is_real_intent)
+
+    assert compute.calls == 2
+    assert not list(tmp_path.iterdir())
+
+
+def test_load_or_compute_recomputes_corrupt_entry(tmp_path):
+    (tmp_path / "intent_k.json").write_text("{truncated")
+    compute = _Counter({"primary_entity": "Product"})
+
+    assert cp._load_or_compute(tmp_path, "intent", "k", compute) == {"primary_entity": "Product"}
+    assert compute.calls == 1
+
+
+def test_task_cache_key_changes_with_head_sha_and_graph_mtime():
+    key = cp._task_cache_key(TASK, 100, "sha1")
+
+    assert key == cp._task_cache_key(dict(TASK), 100, "sha1")
+    assert key != cp._task_cache_key(TASK, 100, "sha2")
+    assert key != cp._task_cache_key(TASK, 101, "sha1")
+    assert key != cp._task_cache_key({**TASK, "description": "Remove it."}, 100, "sha1")
+
+
+def test_task_step_cache_keys_by_pr_head(tmp_path, monkeypatch):
+    processor = _processor(monkeypatch, {"files": [], "head": {"sha": "abc123"}})
+
+    cache_dir, key = cp._task_step_cache(processor, TASK, tmp_path, 100)
+
+    assert cache_dir == tmp_path
+    assert key == cp._task_cache_key(TASK, 100, "abc123")
+
+
+def test_task_step_cache_disables_caching_when_pr_fetch_fails(tmp_path, monkeypatch):
+    processor = _processor(monkeypatch, None)
+
+    cache_dir, _ = cp._task_step_cache(processor, TASK, tmp_path, 100)
+
+    assert cache_dir is None
+
+
+def test_task_step_cache_without_pr_link_keeps_cache_dir(tmp_path, monkeypatch):
+    processor = _processor(monkeypatch, None)
+    task = {"description": TASK["description"]}
+
+    assert cp._task_step_cache(processor, task, tmp_path, 100) == (tmp_path, cp._task_cache_key(task, 100))
+
+
+DIFF = """\
+diff --git a/src/models.py b/src/models.py
+index 1111111..2222222 100644
+--- a/src/models.py
++++ b/src/models.py
+@@ -1,3 +1,4 @@
+ class Product:
+-    name = Column(String)
++    name = Column(String(255))
++    category = Column(String)
+@@ -10,2 +11,2 @@ class Product:
+-    price = 0
++    price = Column(Numeric)
+diff --git a/ui/Category.tsx b/ui/Category.tsx
+new file mode 100644
+index 0000000..3333333
+--- /dev/null
++++ b/ui/Category.tsx
+@@ -0,0 +1,1 @@
++export const Category = () => <span>Category</span>;
+diff --git a/old.py b/old.py
+deleted file mode 100644
+index 4444444..0000000
+--- a/old.py
++++ /dev/null
+@@ -1 +0,0 @@
+-x = 1
+diff --git a/a.txt b/b.txt
+similarity index 100%
+rename from a.txt
+rename to b.txt
+"""
+
+
+def test_parse_unified_diff_splits_files_and_hunks():
+    files = cp._parse_unified_diff(DIFF)
+
+    assert [(f["filename"], f["status"]) for f in files] == [
+        ("src/models.py", "modified"),
+        ("ui/Category.tsx", "added"),
+        ("old.py", "removed"),
+        ("b.txt", "renamed"),
+    ]
+    models = files[0]
+    assert models["patch"].startswith("@@ -1,3 +1,4 @@")
+    assert models["patch"].count("\n@@") == 1
+    assert (models["additions"], models["deletions"]) == (3, 2)
+    assert (files[1]["additions"], files[1]["deletions"]) == (1, 0)
+    assert (files[2]["additions"], files[2]["deletions"]) == (0, 1)
+    assert files[3]["patch"] == ""
+
+
+def test_parse_unified_diff_ignores_text_without_file_headers():
+    assert cp._parse_unified_diff("") == []
+    assert cp._parse_unified_diff("@@ -1 +1 @@\n-a\n+b\n") == []
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('```json\n{"a": 1}\n```', '{"a": 1}'),
+    ('Here you go: {"a": {"b": [1, 2]}} trailing prose {"c": 2}', '{"a": {"b": [1, 2]}}'),
+    ('{"s": "braces } and { in \\"strings\\""}', '{"s": "braces } and { in \\"strings\\""}'),
+    ('{"path": "C:\\\\"}', '{"path": "C:\\\\"}'),
+    ('{"a": 1, "b": {"c": 2', None),
+    ("no json here", None),
+])
+def test_extract_json_blob(text, expected):
+    assert cp._extract_json_blob(text) == expected